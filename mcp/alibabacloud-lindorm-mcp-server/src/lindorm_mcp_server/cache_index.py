@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    filename TEXT PRIMARY KEY,
+    tool_name TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    normalized_sql TEXT,
+    row_count INTEGER,
+    byte_size INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ready',
+    error TEXT,
+    target TEXT NOT NULL DEFAULT 'default',
+    database TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_tool
+    ON cache_entries (tool_name, params_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_sql
+    ON cache_entries (normalized_sql, created_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_created
+    ON cache_entries (created_at);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_target
+    ON cache_entries (target, database, created_at);
+CREATE TABLE IF NOT EXISTS cache_entry_tables (
+    table_name TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    PRIMARY KEY (table_name, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entry_tables_filename
+    ON cache_entry_tables (filename);
+"""
+
+# 未指定 target 的调用落在默认目标（与 targets.DEFAULT_TARGET 一致）
+_DEFAULT_TARGET = "default"
+
+# 缓存条目状态：pending 为后台写入中，failed 为写入失败（error 记录原因）
+STATUS_READY = "ready"
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+
+# 多个服务进程共享缓存目录，pending 超过该时长仍未写完才视为写入进程已退出
+PENDING_EXPIRE_MINUTES = 10
+
+_QUOTED = re.compile(r"('(?:[^']|'')*')")
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+([`\"]?[\w.]+[`\"]?)", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """统一空白、大小写（字符串字面量除外）和结尾分号，用于匹配相同查询"""
+    if not sql:
+        return None
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i]).lower()
+    return "".join(parts).strip()
+
+
+def _params_sql(params: dict) -> str:
+    """工具参数中的 SQL（检索工具的 query 是自然语言，不算）"""
+    sql = normalize_sql(params.get("query")) if isinstance(params.get("query"), str) else None
+    return sql if sql and sql.startswith(("select", "with")) else None
+
+
+def referenced_tables(params: dict) -> list[str]:
+    """从工具参数中提取涉及的表/索引名"""
+    tables = set()
+    sql = _params_sql(params)
+    if sql:
+        for name in _TABLE_REF.findall(_QUOTED.sub("''", sql)):
+            name = name.strip('`"')
+            # 子查询 FROM ( ... ) 不会匹配；跳过 database.table 的库名前缀
+            tables.add(name.split(".")[-1])
+    for key in ("table_name", "index_name", "table"):
+        if isinstance(params.get(key), str):
+            tables.add(params[key].lower())
+    return sorted(tables)
+
+
+def _backfill_row_count(cache_data: dict):
+    """旧缓存文件未记录行数，仅对 SQL 结果按工具输出格式推算"""
+    if cache_data.get("tool_name") != "lindorm_execute_sql":
+        return None
+    prefix = f"The results of executing sql {cache_data['params'].get('query')} is\n"
+    result = cache_data.get("result", "")
+    if not result.startswith(prefix):
+        return None
+    lines = result[len(prefix):].strip().split("\n")
+    return max(len(lines) - 1, 0)
+
+
+class CacheIndex:
+    """
+    缓存文件的 SQLite 索引，按工具/参数哈希、规范化 SQL、涉及的表及时间检索，
+    避免遍历 cache 目录和解析文件名。每次操作使用独立连接，可在多线程中调用。
+    """
+
+    def __init__(self, cache_dir: str, db_path: str = None):
+        self.cache_dir = cache_dir
+        self.db_path = db_path or os.path.join(cache_dir, "cache_index.db")
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(
+        self,
+        filename: str,
+        tool_name: str,
+        params: dict,
+        params_hash: str,
+        created_at: str,
+        byte_size: int,
+        row_count: int = None,
+        status: str = STATUS_READY,
+    ):
+        """
+        登记一个缓存文件，已存在时覆盖；status 为 pending 时文件尚未写入
+        目标与数据库取自参数中的 target/database，database 为空表示目标的默认数据库
+        """
+        normalized_sql = _params_sql(params)
+        tables = referenced_tables(params)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(filename, tool_name, params_hash, normalized_sql, row_count, byte_size, "
+                "created_at, status, target, database) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    filename,
+                    tool_name,
+                    params_hash,
+                    normalized_sql,
+                    row_count,
+                    byte_size,
+                    created_at,
+                    status,
+                    params.get("target") or _DEFAULT_TARGET,
+                    params.get("database"),
+                ),
+            )
+            conn.execute("DELETE FROM cache_entry_tables WHERE filename = ?", (filename,))
+            conn.executemany(
+                "INSERT INTO cache_entry_tables (table_name, filename) VALUES (?, ?)",
+                [(table, filename) for table in tables],
+            )
+
+    def mark_failed(self, filename: str, error: str):
+        """记录缓存文件写入失败，检索时可见"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE cache_entries SET status = ?, error = ? WHERE filename = ?",
+                (STATUS_FAILED, error, filename),
+            )
+
+    def remove(self, filename: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache_entries WHERE filename = ?", (filename,))
+            conn.execute("DELETE FROM cache_entry_tables WHERE filename = ?", (filename,))
+
+    def sync(self, params_hash_func) -> tuple[int, int]:
+        """
+        与缓存目录对齐：登记未索引的文件，删除文件已不存在的条目；
+        超过 PENDING_EXPIRE_MINUTES 仍为 pending 的条目视为写入进程已退出，标记为失败
+        :param params_hash_func: 由 (tool_name, params) 计算参数哈希的函数
+        :return: (新增数, 删除数)
+        """
+        files = {f for f in os.listdir(self.cache_dir) if f.endswith(".json")}
+        expire_before = datetime.now() - timedelta(minutes=PENDING_EXPIRE_MINUTES)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE cache_entries SET status = ?, error = ? "
+                "WHERE status = ? AND created_at < ?",
+                (
+                    STATUS_FAILED,
+                    "interrupted before the write finished",
+                    STATUS_PENDING,
+                    expire_before.isoformat(),
+                ),
+            )
+            indexed = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT filename FROM cache_entries WHERE status = ?", (STATUS_READY,)
+                )
+            }
+
+        added = 0
+        # 非 ready 条目的文件若已存在（写入完成但登记失败），按完整文件重新登记
+        for filename in sorted(files - indexed):
+            filepath = os.path.join(self.cache_dir, filename)
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    cache_data = json.load(f)
+                tool_name = cache_data["tool_name"]
+                params = cache_data.get("params", {})
+            except (OSError, ValueError, KeyError):
+                continue
+            self.add(
+                filename,
+                tool_name,
+                params,
+                params_hash_func(tool_name, params),
+                cache_data.get("cached_at", ""),
+                os.path.getsize(filepath),
+                _backfill_row_count(cache_data),
+            )
+            added += 1
+
+        stale = indexed - files
+        for filename in stale:
+            self.remove(filename)
+        return added, len(stale)
+
+    def search(
+        self,
+        tool_name: str = None,
+        sql: str = None,
+        table: str = None,
+        params_hash: str = None,
+        target: str = None,
+        database: str = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """按条件检索缓存条目，最新的在前"""
+        conditions, args = [], []
+        if tool_name:
+            conditions.append("e.tool_name = ?")
+            args.append(tool_name)
+        if params_hash:
+            conditions.append("e.params_hash = ?")
+            args.append(params_hash)
+        if target:
+            conditions.append("e.target = ?")
+            args.append(target)
+        if database:
+            conditions.append("e.database = ?")
+            args.append(database)
+        if sql:
+            conditions.append("e.normalized_sql = ?")
+            args.append(normalize_sql(sql))
+        if table:
+            conditions.append(
+                "e.filename IN (SELECT filename FROM cache_entry_tables WHERE table_name = ?)"
+            )
+            args.append(table.strip('`"').lower())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (
+            "SELECT e.*, (SELECT group_concat(t.table_name, ',') FROM cache_entry_tables t "
+            "WHERE t.filename = e.filename) AS tables "
+            f"FROM cache_entries e {where} "
+            "ORDER BY e.created_at DESC, e.filename DESC LIMIT ?"
+        )
+        args.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, args).fetchall()
+
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry["tables"] = entry["tables"].split(",") if entry["tables"] else []
+            entry["location"] = os.path.join(self.cache_dir, entry.pop("filename"))
+            entries.append(entry)
+        return entries
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
@@ -1,3 +1,7 @@
+import queue
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import Error
 
@@ -50,29 +54,99 @@ class LindormWideTableClient:
 
     def execute_query(self, query: str) -> str:
         """Execute SQL commands."""
+        columns, rows = self.execute_query_rows(query)
+        if columns is None:
+            return rows
+        result = [",".join(map(str, row)) for row in rows]
+        return "\n".join([",".join(columns)] + result)
+
+    def execute_query_rows(self, query: str):
+        """Execute SQL commands and return (columns, rows), or (None, message) when meeting exceptions."""
         try:
             if not query.strip().upper().startswith("SELECT"):
-                return (f"Query should start with SELECT. " +
-                        "Example: SELECT * FROM table ")
+                return None, (f"Query should start with SELECT. " +
+                              "Example: SELECT * FROM table ")
 
             self.cursor.execute(query)
             # Regular SELECT queries
             columns = [desc[0] for desc in self.cursor.description]
-            rows = self.cursor.fetchall()
-            result = [",".join(map(str, row)) for row in rows]
-            return "\n".join([",".join(columns)] + result)
+            return columns, self.cursor.fetchall()
         except Error as e:
             error_msg = str(e)
             if "Detect inefficient query" in error_msg:
-                return ("Your query was identified as inefficient. " +
-                        "Please add /*+ _l_allow_filtering_ */ hint after the SELECT keyword.\n" +
-                        "Example: SELECT /*+ _l_allow_filtering_ */ * FROM table\n" +
-                        "Instead of: SELECT * FROM table")
+                return None, ("Your query was identified as inefficient. " +
+                              "Please add /*+ _l_allow_filtering_ */ hint after the SELECT keyword.\n" +
+                              "Example: SELECT /*+ _l_allow_filtering_ */ * FROM table\n" +
+                              "Instead of: SELECT * FROM table")
             elif "JOIN is not allowed" in error_msg or "UNION is not allowed" in error_msg:
-                return "JOIN UNION is not allowed. Please execute 'ALTER SYSTEM SET `lindorm.sql.join_union.disabled`=FALSE' to enable join."
-            return f"Error executing query: {str(e)}"
+                return None, "JOIN UNION is not allowed. Please execute 'ALTER SYSTEM SET `lindorm.sql.join_union.disabled`=FALSE' to enable join."
+            return None, f"Error executing query: {str(e)}"
+
+    def query_rows(self, query: str):
+        """Execute a query and return (columns, rows). Errors are raised to the caller."""
+        self.cursor.execute(query)
+        columns = [desc[0] for desc in self.cursor.description]
+        return columns, self.cursor.fetchall()
 
     def reconnect(self):
         """Reconnect to the database."""
         self._close()
         self._connect()
+
+
+class LindormWideTableClientPool:
+    """A pool of LindormWideTableClient bound to one database. Connections are created on demand, up to size."""
+
+    def __init__(self, table_host: str, username: str, password: str, database='default', size: int = 1):
+        self.table_host = table_host
+        self.username = username
+        self.password = password
+        self.database = database
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connected client, blocking while all connections are in use."""
+        self._slots.acquire()
+        try:
+            try:
+                client = self._idle.get_nowait()
+                if not client.connection.is_connected():
+                    client.reconnect()
+            except queue.Empty:
+                client = LindormWideTableClient(self.table_host, self.username, self.password, self.database)
+            try:
+                yield client
+            finally:
+                self._idle.put(client)
+        finally:
+            self._slots.release()
+
+    def show_tables(self) -> str:
+        with self.acquire() as client:
+            return client.show_tables()
+
+    def describe_table(self, table_name: str) -> str:
+        with self.acquire() as client:
+            return client.describe_table(table_name)
+
+    def execute_query(self, query: str) -> str:
+        with self.acquire() as client:
+            return client.execute_query(query)
+
+    def execute_query_rows(self, query: str):
+        with self.acquire() as client:
+            return client.execute_query_rows(query)
+
+    def query_rows(self, query: str):
+        with self.acquire() as client:
+            return client.query_rows(query)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()._close()
+            except queue.Empty:
+                return
@@ -0,0 +1,368 @@
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from .utils import CACHE_DIR
+
+# 物化视图目录（与缓存目录同级）
+MATERIALIZED_DIR = os.path.join(os.path.dirname(CACHE_DIR), "materialized")
+
+GRAINS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+# 查询粒度由细到粗，"all" 表示整个时间范围聚合为一行
+GRAIN_ORDER = ["hour", "day", "all"]
+BUCKET_COLUMN = "bucket"
+
+# 可跨时间桶/维度再聚合的函数及其合并方式
+_MERGE_FUNCS = {"COUNT": sum, "SUM": sum, "MIN": min, "MAX": max}
+_AGG_PATTERN = re.compile(r"^\s*(\w+)\s*\(\s*(DISTINCT\s+)?", re.IGNORECASE)
+
+
+def _merge_func(expression: str):
+    """返回指标的合并函数，不可再聚合（如 COUNT(DISTINCT)、AVG）时返回 None"""
+    match = _AGG_PATTERN.match(expression)
+    if not match or match.group(2):
+        return None
+    return _MERGE_FUNCS.get(match.group(1).upper())
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.strip())
+
+
+def _format_time(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _to_json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+class MaterializedViewDefinition:
+    """
+    预聚合定义：按 grain 时间桶对 table 做 GROUP BY dimensions，
+    metrics 为 {别名: 聚合表达式}，例如 {"message_count": "COUNT(*)"}
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        time_column: str,
+        metrics: dict[str, str],
+        dimensions: list[str] = None,
+        grain: str = "day",
+        where: str = None,
+        allow_filtering: bool = False,
+        refresh_interval_minutes: int = 0,
+        lookback_days: int = 7,
+        last_refreshed_at: str = None,
+    ):
+        if not re.fullmatch(r"\w+", name):
+            raise ValueError(f"Invalid materialized view name: {name}")
+        if grain not in GRAINS:
+            raise ValueError(f"grain should be one of {list(GRAINS)}, got {grain}")
+        if not metrics:
+            raise ValueError("At least one metric is required")
+        self.name = name
+        self.table = table
+        self.time_column = time_column
+        self.metrics = dict(metrics)
+        self.dimensions = list(dimensions or [])
+        self.grain = grain
+        self.where = where
+        self.allow_filtering = allow_filtering
+        self.refresh_interval_minutes = refresh_interval_minutes
+        self.lookback_days = lookback_days
+        self.last_refreshed_at = last_refreshed_at
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MaterializedViewDefinition":
+        return cls(**data)
+
+    def build_sql(self, start: datetime, end: datetime) -> str:
+        """生成单个时间桶 [start, end) 的聚合 SQL"""
+        hint = "/*+ _l_allow_filtering_ */ " if self.allow_filtering else ""
+        select_items = self.dimensions + [
+            f"{expression} AS {alias}" for alias, expression in self.metrics.items()
+        ]
+        sql = (
+            f"SELECT {hint}{', '.join(select_items)} FROM {self.table} "
+            f"WHERE {self.time_column} >= '{_format_time(start)}' "
+            f"AND {self.time_column} < '{_format_time(end)}'"
+        )
+        if self.where:
+            sql += f" AND ({self.where})"
+        if self.dimensions:
+            sql += f" GROUP BY {', '.join(self.dimensions)}"
+        return sql
+
+    def is_due(self, now: datetime) -> bool:
+        """是否需要定时刷新"""
+        if self.refresh_interval_minutes <= 0:
+            return False
+        if not self.last_refreshed_at:
+            return True
+        elapsed = now - _parse_time(self.last_refreshed_at)
+        return elapsed >= timedelta(minutes=self.refresh_interval_minutes)
+
+
+class MaterializedViewStore:
+    """
+    本地物化视图存储：
+    - definitions.json 保存所有预聚合定义
+    - 每个视图一个目录，按天分区，每个分区文件以列式存储 {列名: [值...]}
+    - 分区记录 covered_until，当天分区只覆盖刷新时已结束的时间桶
+    查询时若请求的粒度与时间范围被已刷新的分区完全覆盖，则直接由本地分区回答。
+    """
+
+    def __init__(self, root_dir: str = MATERIALIZED_DIR):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    # ===== 定义管理 =====
+    def _definitions_path(self) -> str:
+        return os.path.join(self.root_dir, "definitions.json")
+
+    def _load_definitions(self) -> dict:
+        path = self._definitions_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_definitions(self, definitions: dict):
+        os.makedirs(self.root_dir, exist_ok=True)
+        path = self._definitions_path()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(definitions, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def define(self, definition: MaterializedViewDefinition):
+        """新增或覆盖定义；定义变化后旧分区不再可信，一并清除"""
+        with self._lock:
+            definitions = self._load_definitions()
+            definitions[definition.name] = definition.to_dict()
+            self._save_definitions(definitions)
+        self._drop_partitions(definition.name)
+
+    def drop(self, name: str) -> bool:
+        with self._lock:
+            definitions = self._load_definitions()
+            if definitions.pop(name, None) is None:
+                return False
+            self._save_definitions(definitions)
+        self._drop_partitions(name)
+        return True
+
+    def get(self, name: str) -> MaterializedViewDefinition:
+        data = self._load_definitions().get(name)
+        if data is None:
+            raise KeyError(f"Materialized view {name} not defined")
+        return MaterializedViewDefinition.from_dict(data)
+
+    def list_definitions(self) -> list[MaterializedViewDefinition]:
+        return [
+            MaterializedViewDefinition.from_dict(data)
+            for data in self._load_definitions().values()
+        ]
+
+    def mark_refreshed(self, name: str, refreshed_at: datetime):
+        """记录定时刷新时间，供 is_due 判断；手动补数不更新，避免推迟定时刷新"""
+        with self._lock:
+            definitions = self._load_definitions()
+            if name in definitions:
+                definitions[name]["last_refreshed_at"] = refreshed_at.isoformat()
+                self._save_definitions(definitions)
+
+    # ===== 分区存储 =====
+    def _view_dir(self, name: str) -> str:
+        return os.path.join(self.root_dir, name)
+
+    def _partition_path(self, name: str, day: date) -> str:
+        return os.path.join(self._view_dir(name), f"{day.isoformat()}.json")
+
+    def _drop_partitions(self, name: str):
+        view_dir = self._view_dir(name)
+        if not os.path.isdir(view_dir):
+            return
+        for filename in os.listdir(view_dir):
+            os.remove(os.path.join(view_dir, filename))
+        os.rmdir(view_dir)
+
+    def list_partitions(self, name: str) -> list[str]:
+        view_dir = self._view_dir(name)
+        if not os.path.isdir(view_dir):
+            return []
+        return sorted(f[:-5] for f in os.listdir(view_dir) if f.endswith(".json"))
+
+    def _read_partition(self, name: str, day: date):
+        path = self._partition_path(name, day)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def partition_days(start: str, end: str) -> list[date]:
+        """返回 [start, end) 覆盖到的所有天分区"""
+        start_time, end_time = _parse_time(start), _parse_time(end)
+        if start_time >= end_time:
+            raise ValueError(f"start {start} should be earlier than end {end}")
+        start_day = start_time.date()
+        end_day = end_time.date()
+        if end_time > datetime.combine(end_day, datetime.min.time()):
+            end_day += timedelta(days=1)
+        return [
+            start_day + timedelta(days=i) for i in range((end_day - start_day).days)
+        ]
+
+    def refresh_partition(self, name: str, sql_client, day: date) -> int:
+        """
+        从 Lindorm 重新计算一个天分区，逐个时间桶执行小范围 GROUP BY
+        返回分区行数，查询失败时抛出异常且不覆盖旧分区
+        """
+        definition = self.get(name)
+        step = GRAINS[definition.grain]
+        columns = [BUCKET_COLUMN] + definition.dimensions + list(definition.metrics)
+        data = {column: [] for column in columns}
+
+        # 只计算已结束的时间桶，当天分区只覆盖到刷新时刻之前最后一个完整的桶
+        refreshed_at = datetime.now()
+        bucket_start = datetime.combine(day, datetime.min.time())
+        day_end = bucket_start + timedelta(days=1)
+        while bucket_start < day_end:
+            bucket_end = bucket_start + step
+            if bucket_end > refreshed_at:
+                break
+            sql = definition.build_sql(bucket_start, bucket_end)
+            _, rows = sql_client.query_rows(sql)
+            for row in rows:
+                data[BUCKET_COLUMN].append(_format_time(bucket_start))
+                for column, value in zip(columns[1:], row):
+                    data[column].append(_to_json_value(value))
+            bucket_start = bucket_end
+
+        partition = {
+            "view": name,
+            "partition": day.isoformat(),
+            "grain": definition.grain,
+            "refreshed_at": refreshed_at.isoformat(),
+            "covered_until": _format_time(bucket_start),
+            "complete": bucket_start >= day_end,
+            "row_count": len(data[BUCKET_COLUMN]),
+            "columns": data,
+        }
+        os.makedirs(self._view_dir(name), exist_ok=True)
+        path = self._partition_path(name, day)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(partition, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return partition["row_count"]
+
+    # ===== 查询 =====
+    def query(
+        self,
+        name: str,
+        start: str,
+        end: str,
+        grain: str = None,
+        dimensions: list[str] = None,
+        metrics: list[str] = None,
+    ):
+        """
+        由本地分区回答 [start, end) 范围内的聚合查询
+        :return: (columns, rows, missing)；无法由物化视图回答时 columns 为 None，
+                 missing 为缺失的分区或不满足的原因
+        """
+        definition = self.get(name)
+        start_time, end_time = _parse_time(start), _parse_time(end)
+        if start_time >= end_time:
+            raise ValueError(f"start {start} should be earlier than end {end}")
+        grain = grain or definition.grain
+        dimensions = definition.dimensions if dimensions is None else list(dimensions)
+        metrics = list(definition.metrics) if metrics is None else list(metrics)
+
+        reasons = []
+        if grain not in GRAIN_ORDER:
+            reasons.append(f"grain should be one of {GRAIN_ORDER}")
+        elif GRAIN_ORDER.index(grain) < GRAIN_ORDER.index(definition.grain):
+            reasons.append(f"grain {grain} is finer than stored grain {definition.grain}")
+        unknown = [d for d in dimensions if d not in definition.dimensions]
+        unknown += [m for m in metrics if m not in definition.metrics]
+        if unknown:
+            reasons.append(f"unknown columns {unknown}")
+        step = GRAINS[definition.grain]
+        for bound in (start_time, end_time):
+            if (bound - datetime.combine(bound.date(), datetime.min.time())) % step:
+                reasons.append(f"{bound} is not aligned to {definition.grain}")
+        rollup = grain != definition.grain or dimensions != definition.dimensions
+        if rollup:
+            non_additive = [
+                m
+                for m in metrics
+                if m in definition.metrics and _merge_func(definition.metrics[m]) is None
+            ]
+            if non_additive:
+                reasons.append(f"metrics {non_additive} cannot be re-aggregated")
+        if reasons:
+            return None, [], reasons
+
+        days = self.partition_days(start, end)
+        partitions = [(day, self._read_partition(name, day)) for day in days]
+        missing = []
+        for day, partition in partitions:
+            if partition is None:
+                missing.append(day.isoformat())
+                continue
+            # 分区在当天结束前刷新时只覆盖到 covered_until，之后的桶视为缺失
+            covered_until = _parse_time(partition["covered_until"])
+            day_end = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+            if covered_until < min(end_time, day_end):
+                missing.append(
+                    f"{day.isoformat()} (covered until {_format_time(covered_until)})"
+                )
+        if missing:
+            return None, [], missing
+
+        start_key, end_key = _format_time(start_time), _format_time(end_time)
+        groups = {}
+        for _, partition in partitions:
+            data = partition["columns"]
+            for i, bucket in enumerate(data[BUCKET_COLUMN]):
+                if not start_key <= bucket < end_key:
+                    continue
+                if grain == "all":
+                    bucket_key = start_key
+                elif grain == "day":
+                    bucket_key = bucket[:10]
+                else:
+                    bucket_key = bucket
+                key = (bucket_key,) + tuple(data[d][i] for d in dimensions)
+                groups.setdefault(key, []).append([data[m][i] for m in metrics])
+
+        columns = [BUCKET_COLUMN] + dimensions + metrics
+        rows = []
+        for key in sorted(groups, key=lambda k: tuple(str(v) for v in k)):
+            values = groups[key]
+            if rollup:
+                merged = []
+                for j, m in enumerate(metrics):
+                    column_values = [v[j] for v in values if v[j] is not None]
+                    merge = _merge_func(definition.metrics[m])
+                    merged.append(merge(column_values) if column_values else None)
+            else:
+                merged = values[0]
+            rows.append(list(key) + merged)
+        return columns, rows, []
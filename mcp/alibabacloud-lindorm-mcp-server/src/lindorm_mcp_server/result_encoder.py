@@ -0,0 +1,36 @@
+from .utils import mark_cache_failed, save_to_cache
+
+# 行数超过该值时完整结果在后台编码并写入缓存，先返回预览
+BACKGROUND_WRITE_ROWS = 1000
+
+
+def encode_rows(columns: list, rows: list) -> str:
+    """将查询结果编码为 header + 逗号分隔行的文本"""
+    lines = [",".join(columns)]
+    lines.extend(",".join(map(str, row)) for row in rows)
+    return "\n".join(lines)
+
+
+def execute_with_preview(sql_client, query: str):
+    """
+    执行查询并编码前 3 行预览，完整结果留给缓存写入线程编码
+    :return: (columns, rows, preview)；查询失败时 columns 为 None，rows 与 preview 为错误提示
+    """
+    columns, rows = sql_client.execute_query_rows(query)
+    if columns is None:
+        return None, rows, rows
+    return columns, rows, encode_rows(columns, rows[:3])
+
+
+def write_cache(
+    tool_name: str, params: dict, title: str, columns: list, rows: list, filepath: str
+) -> str:
+    """编码完整结果并写入缓存文件，失败时在缓存索引中标记为 failed 后抛出"""
+    try:
+        full_output = title + encode_rows(columns, rows)
+        return save_to_cache(
+            tool_name, params, full_output, row_count=len(rows), filepath=filepath
+        )
+    except Exception as e:
+        mark_cache_failed(filepath, str(e))
+        raise
@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from functools import partial
+from typing import Any, Callable
+
+
+class Priority(IntEnum):
+    """调度优先级，数值越小越先执行"""
+
+    METADATA = 0
+    RETRIEVAL = 1
+    HEAVY_SQL = 2
+
+
+class SchedulerCancelledError(RuntimeError):
+    """排队中的任务因调度器关闭而被取消"""
+
+
+class _BackendQueue:
+    """
+    单个后端的并发槽位与按优先级排序的等待队列
+    reserved 个槽位只供 METADATA 使用，其余优先级最多占用 limit - reserved 个槽位，
+    大查询占满共享槽位时元数据查询仍可立即执行
+    """
+
+    def __init__(self, limit: int, reserved: int = 0):
+        self.limit = max(1, limit)
+        self.reserved = min(max(0, reserved), self.limit - 1)
+        self.active = 0
+        self.shared_active = 0
+        self._waiters = []  # (priority, seq, future)
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _available(self, priority: int) -> bool:
+        if self.active >= self.limit:
+            return False
+        if priority == Priority.METADATA:
+            return True
+        return self.shared_active < self.limit - self.reserved
+
+    def _take(self, priority: int):
+        self.active += 1
+        if priority != Priority.METADATA:
+            self.shared_active += 1
+
+    async def acquire(self, priority: Priority):
+        # 同等或更高优先级的任务在排队时不插队
+        blocked = any(
+            not fut.done() and waiter_priority <= priority
+            for waiter_priority, _, fut in self._waiters
+        )
+        if self._available(priority) and not blocked:
+            self._take(priority)
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), fut))
+        try:
+            # 槽位由 release 直接转交，计数已在转交时更新
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                # 槽位已转交但调用方被取消，归还槽位
+                self.release(priority)
+            raise
+
+    def release(self, priority: Priority):
+        self.active -= 1
+        if priority != Priority.METADATA:
+            self.shared_active -= 1
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        # 堆顶优先级最高；堆顶不能执行时，其后的任务也不能执行
+        if self._waiters and self._available(self._waiters[0][0]):
+            waiter_priority, _, fut = heapq.heappop(self._waiters)
+            self._take(waiter_priority)
+            fut.set_result(None)
+
+    def cancel(self) -> int:
+        """取消所有排队中的任务"""
+        cancelled = 0
+        for _, _, fut in self._waiters:
+            if not fut.done():
+                fut.set_exception(SchedulerCancelledError("queued task cancelled"))
+                cancelled += 1
+        self._waiters = []
+        return cancelled
+
+
+class BackendScheduler:
+    """
+    后端调用的准入控制：
+    - 每个后端（如每个目标的 sql / search）独立的并发上限
+    - 排队任务按优先级执行：元数据 > 检索 > 重 SQL
+    - 可为元数据预留槽位，正在执行的大查询不阻塞元数据查询
+    - 统计排队耗时，会话结束（lifespan 退出）时取消排队中的任务
+    阻塞调用在线程中执行，不占用事件循环。
+    """
+
+    def __init__(self, limits: dict[str, int] = None):
+        limits = limits or {}
+        self._queues = {name: _BackendQueue(limit) for name, limit in limits.items()}
+        self._metrics = {}
+
+    def ensure_backend(self, backend: str, limit: int, reserved: int = 0):
+        """
+        按需注册后端（如新的目标实例/数据库），已存在时保持原有并发上限
+        reserved 为其中只供 METADATA 使用的槽位数
+        """
+        if backend not in self._queues:
+            self._queues[backend] = _BackendQueue(limit, reserved)
+
+    def _metric(self, backend: str, priority: Priority) -> dict:
+        key = (backend, priority.name.lower())
+        if key not in self._metrics:
+            self._metrics[key] = {
+                "submitted": 0,
+                "started": 0,
+                "completed": 0,
+                "failed": 0,
+                "cancelled": 0,
+                "total_wait_ms": 0.0,
+                "max_wait_ms": 0.0,
+            }
+        return self._metrics[key]
+
+    async def run(
+        self,
+        backend: str,
+        priority: Priority,
+        func: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """按优先级排队获取后端槽位，然后在线程中执行 func"""
+        queue = self._queues[backend]
+        metric = self._metric(backend, priority)
+        metric["submitted"] += 1
+
+        enqueued_at = time.perf_counter()
+        try:
+            await queue.acquire(priority)
+        except (SchedulerCancelledError, asyncio.CancelledError):
+            metric["cancelled"] += 1
+            raise
+        wait_ms = (time.perf_counter() - enqueued_at) * 1000
+        metric["started"] += 1
+        metric["total_wait_ms"] += wait_ms
+        metric["max_wait_ms"] = max(metric["max_wait_ms"], wait_ms)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, partial(func, *args, **kwargs))
+        # 调用方被取消时线程仍在使用连接，需等线程结束才释放槽位
+        future.add_done_callback(lambda _: queue.release(priority))
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            metric["cancelled"] += 1
+            raise
+        except Exception:
+            metric["failed"] += 1
+            raise
+        metric["completed"] += 1
+        return result
+
+    def cancel_all(self) -> int:
+        """取消所有排队中的任务（用于会话结束/服务关闭）"""
+        return sum(queue.cancel() for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        """返回每个后端的并发状态及按优先级统计的排队耗时"""
+        backends = {}
+        for name, queue in self._queues.items():
+            backends[name] = {
+                "limit": queue.limit,
+                "reserved_for_metadata": queue.reserved,
+                "active": queue.active,
+                "queued": queue.queued,
+                "priorities": {},
+            }
+        for (backend, priority_name), metric in self._metrics.items():
+            started = metric["started"]
+            avg_wait = metric["total_wait_ms"] / started if started else 0.0
+            backends[backend]["priorities"][priority_name] = {
+                **metric,
+                "avg_wait_ms": round(avg_wait, 2),
+                "total_wait_ms": round(metric["total_wait_ms"], 2),
+                "max_wait_ms": round(metric["max_wait_ms"], 2),
+            }
+        return backends
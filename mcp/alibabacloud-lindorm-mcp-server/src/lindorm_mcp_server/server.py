@@ -1,23 +1,66 @@
 import argparse
+import asyncio
+import logging
 import os
 from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 from typing import AsyncIterator
 from dotenv import load_dotenv
 from mcp.server.fastmcp import Context, FastMCP
 
 from .utils import *
 from .lindorm_vector_search import LindormVectorSearchClient
-from .lindorm_wide_table import LindormWideTableClient
+from .lindorm_wide_table import LindormWideTableClientPool
+from .materialized_view import MaterializedViewDefinition, MaterializedViewStore
+from .result_encoder import BACKGROUND_WRITE_ROWS, execute_with_preview, write_cache
+from .scheduler import BackendScheduler, Priority
+from .targets import TargetRegistry
 
 
 class LindormContext:
     def __init__(
         self,
-        lindorm_search_client: LindormVectorSearchClient,
-        lindorm_sql_client: LindormWideTableClient,
+        targets: TargetRegistry,
+        scheduler: BackendScheduler,
+        materialized_store: MaterializedViewStore,
+        sql_concurrency: int = 1,
+        search_concurrency: int = 4,
     ):
-        self.lindorm_search_client = lindorm_search_client
-        self.lindorm_sql_client = lindorm_sql_client
+        self.targets = targets
+        self.scheduler = scheduler
+        self.materialized_store = materialized_store
+        self.sql_concurrency = sql_concurrency
+        self.search_concurrency = search_concurrency
+        self._cache_writes = set()
+
+    def sql_backend(
+        self, target: str = None, database: str = None
+    ) -> tuple[str, LindormWideTableClientPool]:
+        """
+        返回目标数据库的调度后端名与 SQL 连接池，每个连接池单独限流
+        除 sql_concurrency 个共享槽位外另预留一个元数据槽位（连接池也多一个连接）
+        """
+        lindorm_target = self.targets.get(target)
+        sql_pool = lindorm_target.sql_pool(database)
+        backend = f"sql:{lindorm_target.name}/{sql_pool.database}"
+        self.scheduler.ensure_backend(backend, self.sql_concurrency + 1, reserved=1)
+        return backend, sql_pool
+
+    def search_backend(self, target: str = None) -> tuple[str, LindormVectorSearchClient]:
+        """返回目标的调度后端名与检索客户端"""
+        lindorm_target = self.targets.get(target)
+        backend = f"search:{lindorm_target.name}"
+        self.scheduler.ensure_backend(backend, self.search_concurrency)
+        return backend, lindorm_target.search_client()
+
+    def track_cache_write(self, write: asyncio.Future):
+        """跟踪后台缓存写入，会话结束时等待其完成"""
+        self._cache_writes.add(write)
+        write.add_done_callback(self._cache_writes.discard)
+        write.add_done_callback(_log_cache_write_error)
+
+    async def wait_cache_writes(self):
+        await asyncio.gather(*self._cache_writes, return_exceptions=True)
 
 
 @asynccontextmanager
@@ -25,37 +68,117 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[LindormContext]:
     """Manage application lifecycle for Lindorm"""
     config = server.config
 
-    vector_search_client = LindormVectorSearchClient(
-        search_host=config.get("lindorm_search_host"),
-        ai_host=config.get("lindorm_ai_host"),
-        username=config.get("username"),
-        password=config.get("password"),
-        text_embedding_model=config.get("text_embedding_model"),
+    # 各目标的连接池与检索客户端在首次使用时创建
+    # SQL 连接池大小与每个数据库的并发上限一致，含一个元数据预留连接
+    sql_concurrency = config.get("sql_concurrency", 1)
+    targets = TargetRegistry(config, config.get("targets"), sql_concurrency + 1)
+    scheduler = BackendScheduler()
+
+    # 启动时登记已有缓存文件，避免首次缓存写入时做全量扫描
+    await asyncio.to_thread(get_cache_index)
+
+    lindorm_context = LindormContext(
+        targets,
+        scheduler,
+        MaterializedViewStore(),
+        sql_concurrency=sql_concurrency,
+        search_concurrency=config.get("search_concurrency", 4),
     )
 
-    sql_client = LindormWideTableClient(
-        table_host=config.get("lindorm_table_host"),
-        username=config.get("username"),
-        password=config.get("password"),
-        database=config.get("table_database"),
+    refresher = asyncio.create_task(
+        _refresh_due_views(
+            lindorm_context, config.get("materialized_refresh_check_seconds", 60)
+        )
     )
 
     try:
-        yield LindormContext(vector_search_client, sql_client)
+        yield lindorm_context
     finally:
-        pass
+        refresher.cancel()
+        # 会话结束，取消仍在排队的后端调用
+        scheduler.cancel_all()
+        # 等待后台缓存写入完成
+        await lindorm_context.wait_cache_writes()
+        targets.close()
+
+
+async def _schedule(ctx: Context, backend: str, priority: Priority, func, *args):
+    """通过调度器在指定后端上执行阻塞调用"""
+    scheduler = ctx.request_context.lifespan_context.scheduler
+    return await scheduler.run(backend, priority, func, *args)
+
+
+def _target_params(params: dict, target: str = None, database: str = None) -> dict:
+    """缓存参数中附带非默认的目标与数据库，未指定时保持原有缓存键不变"""
+    if target:
+        params["target"] = target
+    if database:
+        params["database"] = database
+    return params
+
+
+def _log_cache_write_error(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(f"Error writing result cache: {future.exception()}")
+
+
+async def _refresh_partitions(lindorm_context: LindormContext, name: str, days: list[date]):
+    """逐个分区刷新物化视图，每个分区单独排队，避免长时间占用 SQL 槽位"""
+    backend, sql_pool = lindorm_context.sql_backend()
+    refreshed, errors = {}, {}
+    for day in days:
+        try:
+            refreshed[day.isoformat()] = await lindorm_context.scheduler.run(
+                backend,
+                Priority.HEAVY_SQL,
+                lindorm_context.materialized_store.refresh_partition,
+                name,
+                sql_pool,
+                day,
+            )
+        except Exception as e:
+            errors[day.isoformat()] = str(e)
+    return refreshed, errors
+
+
+async def _refresh_due_views(lindorm_context: LindormContext, check_seconds: int):
+    """定时刷新设置了 refresh_interval_minutes 的物化视图，覆盖最近 lookback_days 天"""
+    store = lindorm_context.materialized_store
+    while True:
+        await asyncio.sleep(check_seconds)
+        try:
+            now = datetime.now()
+            for definition in store.list_definitions():
+                if not definition.is_due(now):
+                    continue
+                days = [
+                    now.date() - timedelta(days=i)
+                    for i in range(definition.lookback_days, -1, -1)
+                ]
+                _, errors = await _refresh_partitions(
+                    lindorm_context, definition.name, days
+                )
+                store.mark_refreshed(definition.name, now)
+                if errors:
+                    logging.error(
+                        f"Error refreshing materialized view {definition.name}: {errors}"
+                    )
+        except Exception as e:
+            # 单轮失败（如 definitions.json 损坏）不应终止后台刷新任务
+            logging.error(f"Error refreshing materialized views: {e}")
 
 
 mcp = FastMCP("Lindorm", lifespan=server_lifespan, log_level="ERROR")
 
 
 @mcp.tool()
-def lindorm_retrieve_from_index(
+async def lindorm_retrieve_from_index(
     index_name: str,
     query: str,
     content_field: str,
     vector_field: str,
     top_k: int = 5,
+    target: str = None,
     ctx: Context = None,
 ) -> str:
     """
@@ -65,11 +188,25 @@ def lindorm_retrieve_from_index(
     :param content_field: the text field that store the content text. You can get it from the index structure by lindorm_get_index_mappings tool
     :param vector_field: the vector field that store the vector index. You can get it from the index structure by lindorm_get_index_mappings tool
     :param top_k: the result number that you want to return
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
     :return: the most relevant content stored in the knowledgebase.
     """
-    lindorm_search_client = ctx.request_context.lifespan_context.lindorm_search_client
-    contents = lindorm_search_client.rrf_search(
-        index_name, query, top_k, content_field, vector_field
+    try:
+        backend, lindorm_search_client = (
+            ctx.request_context.lifespan_context.search_backend(target)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    contents = await _schedule(
+        ctx,
+        backend,
+        Priority.RETRIEVAL,
+        lindorm_search_client.rrf_search,
+        index_name,
+        query,
+        top_k,
+        content_field,
+        vector_field,
     )
 
     # 完整结果用于缓存
@@ -81,16 +218,21 @@ def lindorm_retrieve_from_index(
     )
 
     # 缓存完整结果
-    cache_path = save_to_cache(
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
         "lindorm_retrieve_from_index",
-        {
-            "index_name": index_name,
-            "query": query,
-            "content_field": content_field,
-            "vector_field": vector_field,
-            "top_k": top_k,
-        },
+        _target_params(
+            {
+                "index_name": index_name,
+                "query": query,
+                "content_field": content_field,
+                "vector_field": vector_field,
+                "top_k": top_k,
+            },
+            target,
+        ),
         full_output,
+        row_count=len(contents),
     )
 
     # 返回精简结果：前3条 + summary + 缓存路径
@@ -109,14 +251,28 @@ def lindorm_retrieve_from_index(
 
 
 @mcp.tool()
-def lindorm_get_index_fields(index_name: str, ctx: Context = None) -> str:
+async def lindorm_get_index_fields(
+    index_name: str, target: str = None, ctx: Context = None
+) -> str:
     """
     Get the fields info of the indexes(or knowledgebase), especially get the vector stored field and content stored field.
     :param index_name: the index name, or known as knowledgebase name
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
     :return: the index fields information
     """
-    lindorm_search_client = ctx.request_context.lifespan_context.lindorm_search_client
-    mapping = lindorm_search_client.get_index_mappings(index_name)
+    try:
+        backend, lindorm_search_client = (
+            ctx.request_context.lifespan_context.search_backend(target)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    mapping = await _schedule(
+        ctx,
+        backend,
+        Priority.METADATA,
+        lindorm_search_client.get_index_mappings,
+        index_name,
+    )
     fields_info = simplify_mappings(mapping, index_name)
 
     # 完整结果用于缓存
@@ -124,8 +280,12 @@ def lindorm_get_index_fields(index_name: str, ctx: Context = None) -> str:
     full_output += json.dumps(fields_info, indent=2, ensure_ascii=False)
 
     # 缓存完整结果
-    cache_path = save_to_cache(
-        "lindorm_get_index_fields", {"index_name": index_name}, full_output
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
+        "lindorm_get_index_fields",
+        _target_params({"index_name": index_name}, target),
+        full_output,
+        row_count=len(fields_info) if fields_info else 0,
     )
 
     # 返回精简结果：前3个字段 + summary + 缓存路径
@@ -144,20 +304,34 @@ def lindorm_get_index_fields(index_name: str, ctx: Context = None) -> str:
 
 
 @mcp.tool()
-def lindorm_list_all_index(ctx: Context = None) -> str:
+async def lindorm_list_all_index(target: str = None, ctx: Context = None) -> str:
     """
     List all the indexes(or knowledgebase) you have.
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
     :return: all the indexes(or knowledgebase) you have
     """
-    lindorm_search_client = ctx.request_context.lifespan_context.lindorm_search_client
-    all_index = lindorm_search_client.list_indexes()
+    try:
+        backend, lindorm_search_client = (
+            ctx.request_context.lifespan_context.search_backend(target)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    all_index = await _schedule(
+        ctx, backend, Priority.METADATA, lindorm_search_client.list_indexes
+    )
 
     # 完整结果用于缓存
     full_output = "All the knowledgebase you have are\n"
     full_output += "\n".join(f"{i + 1}. {index}" for i, index in enumerate(all_index))
 
     # 缓存完整结果
-    cache_path = save_to_cache("lindorm_list_all_index", {}, full_output)
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
+        "lindorm_list_all_index",
+        _target_params({}, target),
+        full_output,
+        row_count=len(all_index),
+    )
 
     # 返回精简结果：前3个索引 + summary + 缓存路径
     total_count = len(all_index)
@@ -176,51 +350,102 @@ def lindorm_list_all_index(ctx: Context = None) -> str:
 
 
 @mcp.tool()
-def lindorm_execute_sql(query: str, ctx: Context = None) -> str:
+async def lindorm_execute_sql(
+    query: str, target: str = None, database: str = None, ctx: Context = None
+) -> str:
     """
     Execute SQL query on Lindorm database.
     :param query: The SQL query to execute which start with select
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
+    :param database: the database to use, default to the target's database
     :return: the results of executing the sql or prompt when meeting certain types of exception
     """
-    lindorm_sql_client = ctx.request_context.lifespan_context.lindorm_sql_client
-    res = lindorm_sql_client.execute_query(query)
-
-    # 完整结果用于缓存
-    full_output = f"The results of executing sql {query} is\n"
-    full_output += res
-
-    # 缓存完整结果
-    cache_path = save_to_cache("lindorm_execute_sql", {"query": query}, full_output)
+    lindorm_context = ctx.request_context.lifespan_context
+    try:
+        backend, lindorm_sql_client = lindorm_context.sql_backend(target, database)
+    except ValueError as e:
+        return f"Error: {e}"
+    title = f"The results of executing sql {query} is\n"
+    params = _target_params({"query": query}, target, database)
+    # SQL 线程只编码预览，完整结果在缓存写入线程中编码
+    columns, rows, preview = await _schedule(
+        ctx,
+        backend,
+        Priority.HEAVY_SQL,
+        execute_with_preview,
+        lindorm_sql_client,
+        query,
+    )
 
-    # 解析结果行数（第一行是header）
-    lines = res.strip().split("\n") if res else []
-    header = lines[0] if lines else ""
-    data_rows = lines[1:] if len(lines) > 1 else []
-    total_rows = len(data_rows)
-    preview_rows = data_rows[:3]
+    if columns is None:
+        # 执行失败，preview 为错误提示
+        cache_path = await asyncio.to_thread(
+            save_to_cache, "lindorm_execute_sql", params, title + preview, row_count=0
+        )
+        response = f"[Summary] SQL query failed\n\n{preview}"
+        response += f"\n\n[Full results cached at] {cache_path}"
+        return response
+
+    total_rows = len(rows)
+    if total_rows <= BACKGROUND_WRITE_ROWS:
+        cache_path = cache_filepath("lindorm_execute_sql", params)
+        await asyncio.to_thread(
+            write_cache, "lindorm_execute_sql", params, title, columns, rows, cache_path
+        )
+        cache_line = f"[Full results cached at] {cache_path}"
+    else:
+        # 大结果先登记为 pending 并返回预览，完整结果在后台编码并写入缓存
+        cache_path = cache_filepath("lindorm_execute_sql", params, unique=True)
+        await asyncio.to_thread(
+            register_pending_cache, "lindorm_execute_sql", params, cache_path, total_rows
+        )
+        lindorm_context.track_cache_write(
+            asyncio.ensure_future(
+                asyncio.to_thread(
+                    write_cache,
+                    "lindorm_execute_sql",
+                    params,
+                    title,
+                    columns,
+                    rows,
+                    cache_path,
+                )
+            )
+        )
+        cache_line = (
+            f"[Full results being written to] {cache_path}\n"
+            "Check its status (pending, ready or failed) with lindorm_search_cache"
+        )
 
     # 返回精简结果：前3行数据 + summary + 缓存路径
     response = f"[Summary] SQL query returned {total_rows} rows\n\n"
-    response += f"[Preview - First 3 rows]\n{header}\n"
-    response += "\n".join(preview_rows)
+    response += f"[Preview - First 3 rows]\n{preview}"
     if total_rows > 3:
         response += f"\n\n... and {total_rows - 3} more rows"
-    response += f"\n\n[Full results cached at] {cache_path}"
+    response += f"\n\n{cache_line}"
 
     return response
 
 
 @mcp.tool()
-def lindorm_show_tables(ctx: Context = None) -> str:
+async def lindorm_show_tables(
+    target: str = None, database: str = None, ctx: Context = None
+) -> str:
     """
     Get all tables in the Lindorm database
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
+    :param database: the database to use, default to the target's database
     :return: the tables in the lindorm database
     """
-    lindorm_sql_client = ctx.request_context.lifespan_context.lindorm_sql_client
-    full_output = lindorm_sql_client.show_tables()
-
-    # 缓存完整结果
-    cache_path = save_to_cache("lindorm_show_tables", {}, full_output)
+    try:
+        backend, lindorm_sql_client = (
+            ctx.request_context.lifespan_context.sql_backend(target, database)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    full_output = await _schedule(
+        ctx, backend, Priority.METADATA, lindorm_sql_client.show_tables
+    )
 
     # 解析结果（第一行是header）
     lines = full_output.strip().split("\n") if full_output else []
@@ -229,6 +454,15 @@ def lindorm_show_tables(ctx: Context = None) -> str:
     total_tables = len(tables)
     preview_tables = tables[:3]
 
+    # 缓存完整结果
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
+        "lindorm_show_tables",
+        _target_params({}, target, database),
+        full_output,
+        row_count=total_tables,
+    )
+
     # 返回精简结果：前3个表 + summary + 缓存路径
     response = f"[Summary] Found {total_tables} tables in database\n\n"
     response += f"[Preview - First 3 tables]\n{header}\n"
@@ -241,18 +475,28 @@ def lindorm_show_tables(ctx: Context = None) -> str:
 
 
 @mcp.tool()
-def lindorm_describe_table(table_name: str, ctx: Context = None) -> str:
+async def lindorm_describe_table(
+    table_name: str, target: str = None, database: str = None, ctx: Context = None
+) -> str:
     """
     Get tables schema in the Lindorm database
     :param table_name: the table name
+    :param target: the target instance name configured in LINDORM_TARGETS, default to the default instance
+    :param database: the database to use, default to the target's database
     :return: the tables schema
     """
-    lindorm_sql_client = ctx.request_context.lifespan_context.lindorm_sql_client
-    full_output = lindorm_sql_client.describe_table(table_name)
-
-    # 缓存完整结果
-    cache_path = save_to_cache(
-        "lindorm_describe_table", {"table_name": table_name}, full_output
+    try:
+        backend, lindorm_sql_client = (
+            ctx.request_context.lifespan_context.sql_backend(target, database)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    full_output = await _schedule(
+        ctx,
+        backend,
+        Priority.METADATA,
+        lindorm_sql_client.describe_table,
+        table_name,
     )
 
     # 解析结果（第一行是header）
@@ -262,6 +506,15 @@ def lindorm_describe_table(table_name: str, ctx: Context = None) -> str:
     total_columns = len(columns)
     preview_columns = columns[:3]
 
+    # 缓存完整结果
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
+        "lindorm_describe_table",
+        _target_params({"table_name": table_name}, target, database),
+        full_output,
+        row_count=total_columns,
+    )
+
     # 返回精简结果：前3个字段 + summary + 缓存路径
     response = f"[Summary] Table '{table_name}' has {total_columns} columns\n\n"
     response += f"[Preview - First 3 columns]\n{header}\n"
@@ -273,6 +526,241 @@ def lindorm_describe_table(table_name: str, ctx: Context = None) -> str:
     return response
 
 
+@mcp.tool()
+async def lindorm_define_materialized_view(
+    name: str,
+    table: str,
+    time_column: str,
+    metrics: dict[str, str],
+    dimensions: list[str] = None,
+    grain: str = "day",
+    where: str = None,
+    allow_filtering: bool = False,
+    refresh_interval_minutes: int = 0,
+    lookback_days: int = 7,
+    ctx: Context = None,
+) -> str:
+    """
+    Define (or replace) a materialized pre-aggregation of a table, stored locally in time-bucket partitions. Use it for report metrics that are computed repeatedly.
+    :param name: the materialized view name, letters, digits and underscore only
+    :param table: the source table
+    :param time_column: the time column used to bucket rows, e.g. created_at
+    :param metrics: metric alias to aggregate expression, e.g. {"message_count": "COUNT(*)", "active_users": "COUNT(DISTINCT uid)"}
+    :param dimensions: the GROUP BY columns, e.g. ["uid"]
+    :param grain: the time bucket size, "hour" or "day"
+    :param where: optional extra filter condition, e.g. "roleid = 0"
+    :param allow_filtering: add the /*+ _l_allow_filtering_ */ hint to refresh queries
+    :param refresh_interval_minutes: refresh the last lookback_days days on this schedule, 0 means on demand only
+    :param lookback_days: the days refreshed by the scheduled refresh
+    :return: the view definition
+    """
+    store = ctx.request_context.lifespan_context.materialized_store
+    try:
+        definition = MaterializedViewDefinition(
+            name=name,
+            table=table,
+            time_column=time_column,
+            metrics=metrics,
+            dimensions=dimensions,
+            grain=grain,
+            where=where,
+            allow_filtering=allow_filtering,
+            refresh_interval_minutes=refresh_interval_minutes,
+            lookback_days=lookback_days,
+        )
+    except ValueError as e:
+        return f"Error defining materialized view {name}: {e}"
+    store.define(definition)
+
+    response = f"[Summary] Materialized view '{name}' defined, refresh it with lindorm_refresh_materialized_view\n\n"
+    response += json.dumps(definition.to_dict(), indent=2, ensure_ascii=False)
+    return response
+
+
+@mcp.tool()
+async def lindorm_refresh_materialized_view(
+    name: str, start_date: str, end_date: str, ctx: Context = None
+) -> str:
+    """
+    Refresh the day partitions of a materialized view in [start_date, end_date) from Lindorm.
+    Only finished time buckets are computed, so the partition of today covers up to the refresh time.
+    :param name: the materialized view name
+    :param start_date: the first day to refresh, e.g. 2025-10-22
+    :param end_date: the day after the last day to refresh (exclusive), e.g. 2025-11-01
+    :return: the refreshed partitions and their row counts
+    """
+    lindorm_context = ctx.request_context.lifespan_context
+    try:
+        lindorm_context.materialized_store.get(name)
+        days = MaterializedViewStore.partition_days(start_date, end_date)
+    except (KeyError, ValueError) as e:
+        return f"Error refreshing materialized view {name}: {e}"
+
+    refreshed, errors = await _refresh_partitions(lindorm_context, name, days)
+
+    response = f"[Summary] Refreshed {len(refreshed)} of {len(days)} partitions of materialized view '{name}'\n"
+    response += "\n".join(
+        f"{day}: {row_count} rows" for day, row_count in refreshed.items()
+    )
+    if errors:
+        response += "\n\n[Failed partitions]\n"
+        response += "\n".join(f"{day}: {error}" for day, error in errors.items())
+    return response
+
+
+@mcp.tool()
+async def lindorm_query_materialized_view(
+    name: str,
+    start: str,
+    end: str,
+    grain: str = None,
+    dimensions: list[str] = None,
+    metrics: list[str] = None,
+    ctx: Context = None,
+) -> str:
+    """
+    Answer an aggregate query from a materialized view without scanning the cluster, when the requested range is covered by refreshed partitions.
+    COUNT/SUM/MIN/MAX metrics can be rolled up to a coarser grain or fewer dimensions; other metrics (e.g. COUNT(DISTINCT)) only at the stored grain and dimensions.
+    :param name: the materialized view name
+    :param start: the range start (inclusive), e.g. 2025-10-22 or 2025-10-22 08:00:00
+    :param end: the range end (exclusive)
+    :param grain: "hour", "day" or "all", default to the stored grain
+    :param dimensions: the dimensions to group by, default to the stored dimensions
+    :param metrics: the metric aliases to return, default to all metrics
+    :return: the aggregated results, or the reason the view cannot answer the query
+    """
+    store = ctx.request_context.lifespan_context.materialized_store
+    try:
+        columns, rows, missing = store.query(name, start, end, grain, dimensions, metrics)
+    except (KeyError, ValueError) as e:
+        return f"Error querying materialized view {name}: {e}"
+    if columns is None:
+        return (
+            f"[Not covered] Materialized view '{name}' cannot answer this query: {missing}\n"
+            "Refresh the missing partitions with lindorm_refresh_materialized_view, "
+            "or query the table with lindorm_execute_sql"
+        )
+
+    header = ",".join(columns)
+    data_rows = [",".join(map(str, row)) for row in rows]
+
+    # 完整结果用于缓存
+    full_output = f"The results of materialized view {name} from {start} to {end} is\n"
+    full_output += "\n".join([header] + data_rows)
+
+    # 缓存完整结果
+    cache_path = await asyncio.to_thread(
+        save_to_cache,
+        "lindorm_query_materialized_view",
+        {
+            "name": name,
+            "start": start,
+            "end": end,
+            "grain": grain,
+            "dimensions": dimensions,
+            "metrics": metrics,
+        },
+        full_output,
+        row_count=len(data_rows),
+    )
+
+    # 返回精简结果：前3行数据 + summary + 缓存路径
+    total_rows = len(data_rows)
+    response = f"[Summary] Materialized view '{name}' returned {total_rows} rows\n\n"
+    response += f"[Preview - First 3 rows]\n{header}\n"
+    response += "\n".join(data_rows[:3])
+    if total_rows > 3:
+        response += f"\n\n... and {total_rows - 3} more rows"
+    response += f"\n\n[Full results cached at] {cache_path}"
+
+    return response
+
+
+@mcp.tool()
+async def lindorm_list_materialized_views(ctx: Context = None) -> str:
+    """
+    List all materialized views with their definitions and refreshed partitions.
+    :return: the materialized views
+    """
+    store = ctx.request_context.lifespan_context.materialized_store
+    views = []
+    for definition in store.list_definitions():
+        partitions = store.list_partitions(definition.name)
+        views.append(
+            {
+                **definition.to_dict(),
+                "partition_count": len(partitions),
+                "partition_range": [partitions[0], partitions[-1]] if partitions else None,
+            }
+        )
+
+    response = f"[Summary] Found {len(views)} materialized views\n\n"
+    response += json.dumps(views, indent=2, ensure_ascii=False)
+    return response
+
+
+@mcp.tool()
+async def lindorm_search_cache(
+    query: str = None,
+    table: str = None,
+    tool_name: str = None,
+    target: str = None,
+    database: str = None,
+    limit: int = 10,
+    ctx: Context = None,
+) -> str:
+    """
+    Search previously cached tool results before re-running an expensive query, e.g. the latest result of a SQL query, or all cached results touching a table.
+    :param query: the SQL query, matched ignoring whitespace, keyword case and trailing semicolon
+    :param table: the table or index name referenced by the cached results
+    :param tool_name: the tool that produced the results, e.g. lindorm_execute_sql
+    :param target: the target instance the results came from, e.g. default
+    :param database: the database passed to the SQL tools; entries without database ran on the target's default database
+    :param limit: the max number of entries to return, newest first
+    :return: the matched cache entries with their locations and status: ready, pending (still being written) or failed (with the error)
+    """
+    entries = await asyncio.to_thread(
+        get_cache_index().search,
+        tool_name=tool_name,
+        sql=query,
+        table=table,
+        target=target,
+        database=database,
+        limit=limit,
+    )
+
+    response = f"[Summary] Found {len(entries)} cached results\n\n"
+    response += json.dumps(entries, indent=2, ensure_ascii=False)
+    return response
+
+
+@mcp.tool()
+async def lindorm_list_targets(ctx: Context = None) -> str:
+    """
+    List the Lindorm targets (instances) that the SQL and search tools can route to with the target argument.
+    :return: the targets and the databases opened on each
+    """
+    targets = ctx.request_context.lifespan_context.targets
+    described = [target.describe() for target in targets.list_targets()]
+
+    response = f"[Summary] Found {len(described)} targets\n\n"
+    response += json.dumps(described, indent=2, ensure_ascii=False)
+    return response
+
+
+@mcp.tool()
+async def lindorm_scheduler_stats(ctx: Context = None) -> str:
+    """
+    Get the backend scheduler status: concurrency limits, running and queued calls, and queueing time per priority class.
+    :return: the scheduler statistics
+    """
+    scheduler = ctx.request_context.lifespan_context.scheduler
+    stats = scheduler.stats()
+    return "The backend scheduler statistics are\n" + json.dumps(
+        stats, indent=2, ensure_ascii=False
+    )
+
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description="LINDORM MCP Server")
     parser.add_argument("--lindorm_instance_id", type=str, help="Lindorm Search Host")
@@ -288,6 +776,24 @@ def parse_arguments():
         default="default",
         help="The Lindorm Database to execute sql",
     )
+    parser.add_argument(
+        "--sql_concurrency",
+        type=int,
+        default=1,
+        help="Max concurrent SQL queries per target database, plus one reserved metadata connection",
+    )
+    parser.add_argument(
+        "--search_concurrency",
+        type=int,
+        default=4,
+        help="Max concurrent calls to the search backend of each target",
+    )
+    parser.add_argument(
+        "--targets",
+        type=str,
+        help="Extra named targets as JSON, e.g. "
+        '{"prod": {"instance_id": "ld-xxx", "table_database": "app"}}',
+    )
     return parser.parse_args()
 
 
@@ -316,12 +822,20 @@ def main():
         "lindorm_search_host": lindorm_search_host,
         "lindorm_ai_host": lindorm_ai_host,
         "lindorm_table_host": lindorm_table_host,
+        "using_vpc": using_vpc,
         "username": os.environ.get("USERNAME", args.username),
         "password": os.environ.get("PASSWORD", args.password),
         "text_embedding_model": os.environ.get(
             "TEXT_EMBEDDING_MODEL", args.embedding_model
         ),
         "table_database": os.environ.get("TABLE_DATABASE", args.database),
+        "sql_concurrency": int(
+            os.environ.get("LINDORM_SQL_CONCURRENCY", args.sql_concurrency)
+        ),
+        "search_concurrency": int(
+            os.environ.get("LINDORM_SEARCH_CONCURRENCY", args.search_concurrency)
+        ),
+        "targets": json.loads(os.environ.get("LINDORM_TARGETS") or args.targets or "{}"),
     }
     mcp.run()
 
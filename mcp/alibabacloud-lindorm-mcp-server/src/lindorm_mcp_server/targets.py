@@ -0,0 +1,126 @@
+import threading
+
+from .lindorm_vector_search import LindormVectorSearchClient
+from .lindorm_wide_table import LindormWideTableClientPool
+from .utils import (
+    get_lindorm_ai_host,
+    get_lindorm_search_host,
+    get_lindorm_table_host,
+    str_to_bool,
+)
+
+DEFAULT_TARGET = "default"
+
+# 目标可覆盖的配置项
+TARGET_KEYS = (
+    "lindorm_search_host",
+    "lindorm_ai_host",
+    "lindorm_table_host",
+    "username",
+    "password",
+    "text_embedding_model",
+    "table_database",
+)
+
+
+def resolve_target_config(overrides: dict, defaults: dict) -> dict:
+    """
+    合并目标配置：未指定的项继承默认目标；
+    指定 instance_id 时按实例 ID 拼接未显式配置的主机地址，未指定 using_vpc 时沿用默认目标的网络类型
+    """
+    config = {key: defaults.get(key) for key in TARGET_KEYS}
+    instance_id = overrides.get("instance_id")
+    if instance_id:
+        using_vpc = overrides.get("using_vpc", defaults.get("using_vpc", False))
+        if isinstance(using_vpc, str):
+            using_vpc = str_to_bool(using_vpc)
+        config["lindorm_search_host"] = get_lindorm_search_host(instance_id, using_vpc)
+        config["lindorm_ai_host"] = get_lindorm_ai_host(instance_id, using_vpc)
+        config["lindorm_table_host"] = get_lindorm_table_host(instance_id, using_vpc)
+    config.update({key: overrides[key] for key in TARGET_KEYS if key in overrides})
+    return config
+
+
+class LindormTarget:
+    """一个命名的 Lindorm 实例，按数据库懒创建 SQL 连接池，懒创建检索客户端"""
+
+    def __init__(self, name: str, config: dict, sql_pool_size: int = 1):
+        self.name = name
+        self.config = config
+        self.sql_pool_size = sql_pool_size
+        self._sql_pools = {}
+        self._search_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def default_database(self) -> str:
+        return self.config.get("table_database") or "default"
+
+    def sql_pool(self, database: str = None) -> LindormWideTableClientPool:
+        database = database or self.default_database
+        with self._lock:
+            if database not in self._sql_pools:
+                self._sql_pools[database] = LindormWideTableClientPool(
+                    table_host=self.config.get("lindorm_table_host"),
+                    username=self.config.get("username"),
+                    password=self.config.get("password"),
+                    database=database,
+                    size=self.sql_pool_size,
+                )
+            return self._sql_pools[database]
+
+    def search_client(self) -> LindormVectorSearchClient:
+        with self._lock:
+            if self._search_client is None:
+                self._search_client = LindormVectorSearchClient(
+                    search_host=self.config.get("lindorm_search_host"),
+                    ai_host=self.config.get("lindorm_ai_host"),
+                    username=self.config.get("username"),
+                    password=self.config.get("password"),
+                    text_embedding_model=self.config.get("text_embedding_model"),
+                )
+            return self._search_client
+
+    def describe(self) -> dict:
+        """目标信息（不含密码）"""
+        return {
+            "name": self.name,
+            "table_host": self.config.get("lindorm_table_host"),
+            "search_host": self.config.get("lindorm_search_host"),
+            "default_database": self.default_database,
+            "open_databases": sorted(self._sql_pools),
+        }
+
+    def close(self):
+        with self._lock:
+            for pool in self._sql_pools.values():
+                pool.close()
+            self._sql_pools.clear()
+
+
+class TargetRegistry:
+    """命名目标的注册表，default 为启动参数/环境变量配置的实例"""
+
+    def __init__(self, default_config: dict, targets: dict = None, sql_pool_size: int = 1):
+        self._targets = {
+            DEFAULT_TARGET: LindormTarget(DEFAULT_TARGET, default_config, sql_pool_size)
+        }
+        for name, overrides in (targets or {}).items():
+            self._targets[name] = LindormTarget(
+                name, resolve_target_config(overrides, default_config), sql_pool_size
+            )
+
+    def get(self, name: str = None) -> LindormTarget:
+        name = name or DEFAULT_TARGET
+        if name not in self._targets:
+            raise ValueError(
+                f"Unknown target {name}, available targets: {sorted(self._targets)}"
+            )
+        return self._targets[name]
+
+    def list_targets(self) -> list[LindormTarget]:
+        return list(self._targets.values())
+
+    def close(self):
+        for target in self._targets.values():
+            target.close()
@@ -1,10 +1,16 @@
 import json
+import logging
 import os
 import hashlib
+import sqlite3
+import tempfile
+import uuid
 from datetime import datetime
 
 import requests
 
+from .cache_index import STATUS_PENDING, CacheIndex
+
 
 # ===== 缓存功能 =====
 # 缓存目录（相对于项目根目录）
@@ -13,30 +19,63 @@ CACHE_DIR = os.path.join(
 )
 
 
+_cache_index = None
+
+
 def _ensure_cache_dir():
     """确保缓存目录存在"""
     if not os.path.exists(CACHE_DIR):
         os.makedirs(CACHE_DIR)
 
 
+def get_cache_index() -> CacheIndex:
+    """获取缓存索引，首次调用时创建并登记已有缓存文件"""
+    global _cache_index
+    if _cache_index is None:
+        _ensure_cache_dir()
+        index = CacheIndex(CACHE_DIR)
+        index.sync(_generate_cache_key)
+        _cache_index = index
+    return _cache_index
+
+
 def _generate_cache_key(tool_name: str, params: dict) -> str:
     """生成缓存键的哈希值"""
     param_str = json.dumps(params, sort_keys=True, ensure_ascii=False)
     return hashlib.md5(param_str.encode()).hexdigest()[:8]
 
 
-def save_to_cache(tool_name: str, params: dict, result: str) -> str:
+def cache_filepath(tool_name: str, params: dict, unique: bool = False) -> str:
     """
-    保存查询结果到缓存
+    生成缓存文件路径
     命名规范: {tool_name}_{timestamp}_{hash}.json
+    unique 为 True 时追加随机后缀 {tool_name}_{timestamp}_{hash}_{suffix}.json，
+    用于后台写入，同一秒内相同查询的并发调用不会写同一个文件
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    cache_key = _generate_cache_key(tool_name, params)
+    suffix = f"_{uuid.uuid4().hex[:8]}" if unique else ""
+    return os.path.join(CACHE_DIR, f"{tool_name}_{timestamp}_{cache_key}{suffix}.json")
+
+
+def save_to_cache(
+    tool_name: str,
+    params: dict,
+    result: str,
+    row_count: int = None,
+    filepath: str = None,
+) -> str:
+    """
+    保存查询结果到缓存，并登记到缓存索引
+    filepath 为空时按 cache_filepath 生成；先写唯一的临时文件再替换，
+    读取方不会看到写了一半的文件，并发写入同一路径时互不干扰
     返回缓存文件路径
     """
     _ensure_cache_dir()
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = filepath or cache_filepath(tool_name, params)
+    filename = os.path.basename(filepath)
     cache_key = _generate_cache_key(tool_name, params)
-    filename = f"{tool_name}_{timestamp}_{cache_key}.json"
-    filepath = os.path.join(CACHE_DIR, filename)
 
     cache_data = {
         "tool_name": tool_name,
@@ -45,12 +84,64 @@ def save_to_cache(tool_name: str, params: dict, result: str) -> str:
         "cached_at": datetime.now().isoformat(),
     }
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, ensure_ascii=False)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(filepath), prefix=f".{filename}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(cache_data, indent=2, ensure_ascii=False))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # 索引失败不影响缓存文件本身，下次 sync 时会补登记
+    try:
+        get_cache_index().add(
+            filename,
+            tool_name,
+            params,
+            cache_key,
+            cache_data["cached_at"],
+            os.path.getsize(filepath),
+            row_count,
+        )
+    except sqlite3.Error as e:
+        logging.error(f"Error indexing cache file {filename}: {e}")
 
     return filepath
 
 
+def register_pending_cache(
+    tool_name: str, params: dict, filepath: str, row_count: int = None
+):
+    """登记后台写入中的缓存文件，写入完成后由 save_to_cache 覆盖为 ready"""
+    filename = os.path.basename(filepath)
+    try:
+        get_cache_index().add(
+            filename,
+            tool_name,
+            params,
+            _generate_cache_key(tool_name, params),
+            datetime.now().isoformat(),
+            0,
+            row_count,
+            status=STATUS_PENDING,
+        )
+    except sqlite3.Error as e:
+        logging.error(f"Error indexing cache file {filename}: {e}")
+
+
+def mark_cache_failed(filepath: str, error: str):
+    """在缓存索引中记录写入失败，供 lindorm_search_cache 查看"""
+    filename = os.path.basename(filepath)
+    try:
+        get_cache_index().mark_failed(filename, error)
+    except sqlite3.Error as e:
+        logging.error(f"Error indexing cache file {filename}: {e}")
+
+
 #### LINDORM AI EMBEDDING ####
 def _post_model_request(
     host: str, username: str, password: str, model: str, data: dict, **kwargs
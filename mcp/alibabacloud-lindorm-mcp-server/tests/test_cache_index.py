@@ -0,0 +1,136 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+from src.lindorm_mcp_server.cache_index import (
+    CacheIndex,
+    normalize_sql,
+    referenced_tables,
+)
+
+
+def _params_hash(tool_name, params):
+    return "h" + str(len(json.dumps(params)))
+
+
+def _write_cache_file(cache_dir, filename, tool_name, params, result, cached_at):
+    with open(os.path.join(cache_dir, filename), "w", encoding="utf-8") as f:
+        json.dump(
+            {"tool_name": tool_name, "params": params, "result": result, "cached_at": cached_at},
+            f,
+        )
+
+
+@pytest.fixture()
+def cache_dir(tmp_path):
+    cache_dir = str(tmp_path)
+    query = "SELECT uid, COUNT(*) AS cnt FROM message WHERE uid = 'A' GROUP BY uid"
+    _write_cache_file(
+        cache_dir,
+        "lindorm_execute_sql_20251201_183112_aaaaaaaa.json",
+        "lindorm_execute_sql",
+        {"query": query},
+        f"The results of executing sql {query} is\nuid,cnt\nA,3",
+        "2025-12-01T18:31:12",
+    )
+    _write_cache_file(
+        cache_dir,
+        "lindorm_describe_table_20251202_110225_bbbbbbbb.json",
+        "lindorm_describe_table",
+        {"table_name": "message"},
+        "c\nx",
+        "2025-12-02T11:02:25",
+    )
+    _write_cache_file(
+        cache_dir,
+        "lindorm_execute_sql_20251203_104401_cccccccc.json",
+        "lindorm_execute_sql",
+        {"query": "SELECT * FROM share s JOIN default.session t ON s.sid = t.id"},
+        "error",
+        "2025-12-03T10:44:01",
+    )
+    return cache_dir
+
+
+def test_normalize_sql_keeps_literals():
+    assert (
+        normalize_sql("SELECT  *\n FROM Message WHERE uid = 'AbC';")
+        == "select * from message where uid = 'AbC'"
+    )
+    assert referenced_tables(
+        {"query": "SELECT * FROM a JOIN db.b ON a.x = b.x WHERE c = 'FROM d'"}
+    ) == ["a", "b"]
+    assert referenced_tables({"query": "what is lindorm", "index_name": "Docs"}) == ["docs"]
+
+
+def test_cache_index_sync_and_search(cache_dir):
+    index = CacheIndex(cache_dir)
+    assert index.sync(_params_hash) == (3, 0)
+    assert index.sync(_params_hash) == (0, 0)
+
+    latest = index.search(
+        sql="select uid, count(*) as cnt from message  where uid = 'A' group by uid;",
+        limit=1,
+    )
+    assert len(latest) == 1
+    assert latest[0]["row_count"] == 1
+    assert latest[0]["location"].endswith("_aaaaaaaa.json")
+
+    touching_message = index.search(table="MESSAGE")
+    assert [e["tool_name"] for e in touching_message] == [
+        "lindorm_describe_table",
+        "lindorm_execute_sql",
+    ]
+    assert index.search(table="session")[0]["tables"] == ["session", "share"]
+
+    os.remove(os.path.join(cache_dir, "lindorm_describe_table_20251202_110225_bbbbbbbb.json"))
+    assert index.sync(_params_hash) == (0, 1)
+    assert index.count() == 2
+
+
+def test_cache_index_pending_entries(cache_dir):
+    index = CacheIndex(cache_dir)
+    index.sync(_params_hash)
+    for filename, created_at in [
+        ("lindorm_execute_sql_20251204_090000_dddddddd.json", "2025-12-04T09:00:00"),
+        ("lindorm_execute_sql_20251204_090000_ffffffff.json", datetime.now().isoformat()),
+    ]:
+        index.add(
+            filename,
+            "lindorm_execute_sql",
+            {"query": "SELECT uid FROM message"},
+            "h1",
+            created_at,
+            0,
+            1500,
+            status="pending",
+        )
+    assert index.sync(_params_hash) == (0, 0)
+    # 长时间未写完的视为中断，刚登记的可能属于其他仍在写入的服务进程
+    entries = index.search(tool_name="lindorm_execute_sql", params_hash="h1")
+    assert [(e["status"], e["error"]) for e in entries] == [
+        ("pending", None),
+        ("failed", "interrupted before the write finished"),
+    ]
+
+
+def test_cache_index_filters_by_target_and_database(cache_dir):
+    query = "SELECT uid, COUNT(*) AS cnt FROM message WHERE uid = 'A' GROUP BY uid"
+    _write_cache_file(
+        cache_dir,
+        "lindorm_execute_sql_20251205_090000_eeeeeeee.json",
+        "lindorm_execute_sql",
+        {"query": query, "target": "prod", "database": "app"},
+        f"The results of executing sql {query} is\nuid,cnt\nA,5",
+        "2025-12-05T09:00:00",
+    )
+    index = CacheIndex(cache_dir)
+    index.sync(_params_hash)
+
+    assert len(index.search(sql=query)) == 2
+    prod = index.search(sql=query, target="prod")
+    assert [(e["target"], e["database"]) for e in prod] == [("prod", "app")]
+    assert prod[0]["location"].endswith("_eeeeeeee.json")
+    assert index.search(sql=query, target="default")[0]["location"].endswith("_aaaaaaaa.json")
+    assert index.search(database="app", target="default") == []
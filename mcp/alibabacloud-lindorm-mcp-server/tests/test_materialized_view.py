@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from src.lindorm_mcp_server.materialized_view import (
+    MaterializedViewDefinition,
+    MaterializedViewStore,
+)
+
+
+class FakeSqlClient:
+    """按 SQL 中的时间桶返回固定结果"""
+
+    def __init__(self):
+        self.queries = []
+
+    def query_rows(self, query: str):
+        self.queries.append(query)
+        if "'2025-10-22 00:00:00'" in query:
+            return ["uid", "message_count", "active_users"], [("u1", 3, 1), ("u2", 1, 1)]
+        return ["uid", "message_count", "active_users"], [("u1", 2, 1)]
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = MaterializedViewStore(str(tmp_path))
+    store.define(
+        MaterializedViewDefinition(
+            name="daily_messages",
+            table="message",
+            time_column="created_at",
+            metrics={"message_count": "COUNT(*)", "active_users": "COUNT(DISTINCT uid)"},
+            dimensions=["uid"],
+            where="roleid = 0",
+        )
+    )
+    return store
+
+
+def test_materialized_view_build_sql(store):
+    client = FakeSqlClient()
+    store.refresh_partition("daily_messages", client, date(2025, 10, 22))
+    assert client.queries == [
+        "SELECT uid, COUNT(*) AS message_count, COUNT(DISTINCT uid) AS active_users "
+        "FROM message WHERE created_at >= '2025-10-22 00:00:00' "
+        "AND created_at < '2025-10-23 00:00:00' AND (roleid = 0) GROUP BY uid"
+    ]
+    assert store.list_partitions("daily_messages") == ["2025-10-22"]
+    # 手动刷新不推迟定时刷新
+    assert store.get("daily_messages").last_refreshed_at is None
+
+
+def test_materialized_view_query_and_rollup(store):
+    client = FakeSqlClient()
+    for day in MaterializedViewStore.partition_days("2025-10-22", "2025-10-24"):
+        store.refresh_partition("daily_messages", client, day)
+
+    columns, rows, missing = store.query("daily_messages", "2025-10-22", "2025-10-24")
+    assert missing == []
+    assert columns == ["bucket", "uid", "message_count", "active_users"]
+    assert rows == [
+        ["2025-10-22", "u1", 3, 1],
+        ["2025-10-22", "u2", 1, 1],
+        ["2025-10-23", "u1", 2, 1],
+    ]
+
+    columns, rows, _ = store.query(
+        "daily_messages", "2025-10-22", "2025-10-24", grain="all", metrics=["message_count"]
+    )
+    assert columns == ["bucket", "uid", "message_count"]
+    assert rows == [["2025-10-22 00:00:00", "u1", 5], ["2025-10-22 00:00:00", "u2", 1]]
+
+
+def test_materialized_view_query_not_covered(store):
+    store.refresh_partition("daily_messages", FakeSqlClient(), date(2025, 10, 22))
+
+    columns, _, missing = store.query("daily_messages", "2025-10-22", "2025-10-24")
+    assert columns is None
+    assert missing == ["2025-10-23"]
+
+    columns, _, reasons = store.query(
+        "daily_messages", "2025-10-22", "2025-10-23", grain="all", dimensions=[]
+    )
+    assert columns is None
+    assert "cannot be re-aggregated" in reasons[0]
+
+    columns, _, reasons = store.query(
+        "daily_messages", "2025-10-22", "2025-10-23", grain="hour"
+    )
+    assert columns is None
+    assert "finer than stored grain" in reasons[0]
+
+
+def test_materialized_view_partial_partition_not_covered(store):
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    client = FakeSqlClient()
+    store.refresh_partition("daily_messages", client, today)
+    # 当天的天粒度桶尚未结束，不计算也不视为已覆盖
+    assert client.queries == []
+
+    columns, _, missing = store.query(
+        "daily_messages", today.isoformat(), tomorrow.isoformat()
+    )
+    assert columns is None
+    assert missing == [f"{today.isoformat()} (covered until {today.isoformat()} 00:00:00)"]
+
+
+def test_materialized_view_rejects_inverted_range(store):
+    with pytest.raises(ValueError):
+        store.query("daily_messages", "2025-10-24", "2025-10-22")
+    with pytest.raises(ValueError):
+        MaterializedViewStore.partition_days("2025-10-24", "2025-10-22")
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from src.lindorm_mcp_server import lindorm_wide_table, result_encoder, server, utils
+from src.lindorm_mcp_server.materialized_view import MaterializedViewStore
+from src.lindorm_mcp_server.result_encoder import (
+    execute_with_preview,
+    encode_rows,
+    write_cache,
+)
+from src.lindorm_mcp_server.scheduler import BackendScheduler
+from src.lindorm_mcp_server.targets import TargetRegistry
+
+COLUMNS = ["uid", "cnt", "created_at"]
+ROWS = [("u1", Decimal(3), datetime(2025, 10, 22, 8, 0)), ("u2", None, None)]
+
+
+class FakeConnection:
+    def is_connected(self):
+        return True
+
+
+class FakeSqlClient:
+    def __init__(self, *args, **kwargs):
+        self.connection = FakeConnection()
+
+    def execute_query_rows(self, query):
+        if "broken" in query:
+            return None, "Error executing query: broken"
+        if "LIMIT" in query:
+            return COLUMNS, ROWS
+        return ["uid"], [(f"u{i}",) for i in range(1500)]
+
+
+@pytest.fixture()
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(utils, "_cache_index", None)
+    return tmp_path
+
+
+def test_encode_rows():
+    assert encode_rows(COLUMNS, ROWS) == (
+        "uid,cnt,created_at\nu1,3,2025-10-22 08:00:00\nu2,None,None"
+    )
+    assert encode_rows(COLUMNS, []) == "uid,cnt,created_at"
+
+
+def test_execute_with_preview():
+    client = FakeSqlClient()
+    columns, rows, preview = execute_with_preview(client, "SELECT uid FROM message")
+    assert (columns, len(rows)) == (["uid"], 1500)
+    assert preview == "uid\nu0\nu1\nu2"
+    assert execute_with_preview(client, "SELECT broken") == (
+        None,
+        "Error executing query: broken",
+        "Error executing query: broken",
+    )
+
+
+def test_write_cache_marks_failed_entry(cache_dir):
+    params = {"query": "SELECT uid FROM message"}
+    filepath = str(cache_dir / "missing" / "lindorm_execute_sql_20251022_080000_abcdef12.json")
+    utils.register_pending_cache("lindorm_execute_sql", params, filepath, 1500)
+    assert utils.get_cache_index().search(table="message")[0]["status"] == "pending"
+
+    with pytest.raises(OSError):
+        write_cache("lindorm_execute_sql", params, "title\n", COLUMNS, ROWS, filepath)
+    entry = utils.get_cache_index().search(table="message")[0]
+    assert entry["status"] == "failed"
+    assert "No such file" in entry["error"]
+
+
+def test_save_to_cache_concurrent_writes_to_same_path(cache_dir):
+    params = {"query": "SELECT uid FROM message"}
+    filepath = utils.cache_filepath("lindorm_execute_sql", params)
+    assert utils.cache_filepath("lindorm_execute_sql", params, unique=True) != (
+        utils.cache_filepath("lindorm_execute_sql", params, unique=True)
+    )
+    errors = []
+
+    def save(i):
+        try:
+            utils.save_to_cache("lindorm_execute_sql", params, f"result {i}", filepath=filepath)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(filepath, encoding="utf-8") as f:
+        assert json.load(f)["result"].startswith("result ")
+    written = [p.name for p in cache_dir.iterdir() if not p.name.startswith("cache_index.db")]
+    assert written == [os.path.basename(filepath)]
+
+
+@pytest.fixture()
+def lindorm_context(cache_dir, monkeypatch):
+    monkeypatch.setattr(lindorm_wide_table, "LindormWideTableClient", FakeSqlClient)
+    targets = TargetRegistry({"lindorm_table_host": "host", "table_database": "default"})
+    return server.LindormContext(
+        targets, BackendScheduler(), MaterializedViewStore(str(cache_dir / "materialized"))
+    )
+
+
+def test_execute_sql_writes_small_results_before_returning(lindorm_context):
+    ctx = SimpleNamespace(request_context=SimpleNamespace(lifespan_context=lindorm_context))
+    query = "SELECT * FROM message LIMIT 2"
+
+    response = asyncio.run(server.lindorm_execute_sql(query, ctx=ctx))
+    assert response.startswith("[Summary] SQL query returned 2 rows")
+    cache_path = response.split("[Full results cached at] ")[1]
+    with open(cache_path, encoding="utf-8") as f:
+        cache_data = json.load(f)
+    assert cache_data["result"].endswith(encode_rows(COLUMNS, ROWS))
+
+    response = asyncio.run(server.lindorm_execute_sql("SELECT broken", ctx=ctx))
+    assert response.startswith("[Summary] SQL query failed")
+
+
+def test_execute_sql_writes_large_results_in_background(lindorm_context, monkeypatch):
+    ctx = SimpleNamespace(request_context=SimpleNamespace(lifespan_context=lindorm_context))
+    gate = threading.Event()
+    encode_rows = result_encoder.encode_rows
+
+    def slow_encode_rows(columns, rows):
+        # 完整结果的编码在响应返回之后才开始
+        if len(rows) > 3:
+            gate.wait()
+        return encode_rows(columns, rows)
+
+    monkeypatch.setattr(result_encoder, "encode_rows", slow_encode_rows)
+
+    async def main():
+        response = await server.lindorm_execute_sql("SELECT uid FROM message", ctx=ctx)
+        pending = utils.get_cache_index().search(table="message")
+        gate.set()
+        await lindorm_context.wait_cache_writes()
+        return response, pending
+
+    response, pending = asyncio.run(main())
+    assert "... and 1497 more rows" in response
+    assert "[Full results being written to]" in response
+    assert [(e["status"], e["row_count"]) for e in pending] == [("pending", 1500)]
+    entry = utils.get_cache_index().search(table="message")[0]
+    assert entry["status"] == "ready"
+    assert entry["location"] in response
+    with open(entry["location"], encoding="utf-8") as f:
+        assert json.load(f)["result"].endswith("u1499")
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.lindorm_mcp_server.scheduler import (
+    BackendScheduler,
+    Priority,
+    SchedulerCancelledError,
+)
+
+
+def test_scheduler_respects_concurrency_limit():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return "ok"
+
+    async def main():
+        scheduler = BackendScheduler({"sql": 2})
+        return await asyncio.gather(
+            *(scheduler.run("sql", Priority.HEAVY_SQL, work) for _ in range(6))
+        )
+
+    results = asyncio.run(main())
+    assert results == ["ok"] * 6
+    assert peak == 2
+
+
+def test_scheduler_runs_queued_work_by_priority():
+    order = []
+    gate = threading.Event()
+
+    def blocker():
+        gate.wait()
+
+    def record(name):
+        order.append(name)
+
+    async def main():
+        scheduler = BackendScheduler({"sql": 1})
+        first = asyncio.ensure_future(scheduler.run("sql", Priority.HEAVY_SQL, blocker))
+        await asyncio.sleep(0.01)
+        queued = [
+            asyncio.ensure_future(scheduler.run("sql", Priority.HEAVY_SQL, record, "heavy")),
+            asyncio.ensure_future(scheduler.run("sql", Priority.RETRIEVAL, record, "retrieval")),
+            asyncio.ensure_future(scheduler.run("sql", Priority.METADATA, record, "metadata")),
+        ]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["sql"]["queued"] == 3
+        gate.set()
+        await asyncio.gather(first, *queued)
+        return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert order == ["metadata", "retrieval", "heavy"]
+    assert stats["sql"]["active"] == 0
+    assert stats["sql"]["priorities"]["heavy_sql"]["completed"] == 2
+    assert stats["sql"]["priorities"]["metadata"]["max_wait_ms"] > 0
+
+
+def test_scheduler_cancels_queued_work_on_shutdown():
+    gate = threading.Event()
+
+    async def main():
+        scheduler = BackendScheduler({"search": 1})
+        first = asyncio.ensure_future(
+            scheduler.run("search", Priority.RETRIEVAL, gate.wait)
+        )
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(
+            scheduler.run("search", Priority.METADATA, lambda: "queued")
+        )
+        await asyncio.sleep(0.01)
+        assert scheduler.cancel_all() == 1
+        with pytest.raises(SchedulerCancelledError):
+            await queued
+        gate.set()
+        # 已开始执行的任务不受影响，槽位在其结束后归还
+        assert await first is True
+        assert await scheduler.run("search", Priority.METADATA, lambda: "after") == "after"
+        return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert stats["search"]["active"] == 0
+    assert stats["search"]["queued"] == 0
+    assert stats["search"]["priorities"]["metadata"]["cancelled"] == 1
+
+
+def test_scheduler_reserves_slot_for_metadata():
+    gate = threading.Event()
+
+    async def main():
+        scheduler = BackendScheduler()
+        scheduler.ensure_backend("sql", 2, reserved=1)
+        scan = asyncio.ensure_future(scheduler.run("sql", Priority.HEAVY_SQL, gate.wait))
+        await asyncio.sleep(0.01)
+        queued_scan = asyncio.ensure_future(
+            scheduler.run("sql", Priority.HEAVY_SQL, lambda: "scan")
+        )
+        await asyncio.sleep(0.01)
+        # 大查询占满共享槽位时，元数据查询使用预留槽位立即执行
+        metadata = await asyncio.wait_for(
+            scheduler.run("sql", Priority.METADATA, lambda: "tables"), timeout=1
+        )
+        stats = scheduler.stats()
+        gate.set()
+        return metadata, await scan, await queued_scan, stats, scheduler.stats()
+
+    metadata, scan, queued_scan, during, after = asyncio.run(main())
+    assert (metadata, scan, queued_scan) == ("tables", True, "scan")
+    assert during["sql"]["active"] == 1
+    assert during["sql"]["queued"] == 1
+    assert after["sql"]["active"] == 0
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+from src.lindorm_mcp_server import lindorm_wide_table
+from src.lindorm_mcp_server.lindorm_wide_table import LindormWideTableClientPool
+from src.lindorm_mcp_server.targets import TargetRegistry, resolve_target_config
+
+DEFAULT_CONFIG = {
+    "lindorm_search_host": "ld-default-proxy-search-pub.lindorm.aliyuncs.com",
+    "lindorm_ai_host": "ld-default-proxy-ai-pub.lindorm.aliyuncs.com",
+    "lindorm_table_host": "ld-default-proxy-lindorm-pub.lindorm.aliyuncs.com",
+    "username": "root",
+    "password": "secret",
+    "text_embedding_model": "bge",
+    "table_database": "default",
+}
+
+
+class FakeConnection:
+    def is_connected(self):
+        return True
+
+
+class FakeClient:
+    created = []
+
+    def __init__(self, table_host, username, password, database):
+        self.database = database
+        self.connection = FakeConnection()
+        FakeClient.created.append(self)
+
+    def execute_query_rows(self, query):
+        time.sleep(0.02)
+        return ["database"], [(self.database,)]
+
+    def _close(self):
+        pass
+
+
+@pytest.fixture()
+def fake_client(monkeypatch):
+    FakeClient.created = []
+    monkeypatch.setattr(lindorm_wide_table, "LindormWideTableClient", FakeClient)
+    return FakeClient
+
+
+def test_resolve_target_config():
+    config = resolve_target_config(
+        {"instance_id": "ld-prod", "using_vpc": "true", "table_database": "app"},
+        DEFAULT_CONFIG,
+    )
+    assert config["lindorm_table_host"] == "ld-prod-proxy-lindorm-vpc.lindorm.aliyuncs.com"
+    assert config["lindorm_search_host"] == "ld-prod-proxy-search-vpc.lindorm.aliyuncs.com"
+    assert config["table_database"] == "app"
+    assert config["username"] == "root"
+
+    config = resolve_target_config({"table_database": "app"}, DEFAULT_CONFIG)
+    assert config["lindorm_table_host"] == DEFAULT_CONFIG["lindorm_table_host"]
+
+    # 未指定 using_vpc 时沿用默认目标的网络类型
+    config = resolve_target_config(
+        {"instance_id": "ld-prod"}, {**DEFAULT_CONFIG, "using_vpc": True}
+    )
+    assert config["lindorm_table_host"] == "ld-prod-proxy-lindorm-vpc.lindorm.aliyuncs.com"
+    config = resolve_target_config(
+        {"instance_id": "ld-prod", "using_vpc": "false"}, {**DEFAULT_CONFIG, "using_vpc": True}
+    )
+    assert config["lindorm_search_host"] == "ld-prod-proxy-search-pub.lindorm.aliyuncs.com"
+
+
+def test_target_registry_creates_pools_lazily(fake_client):
+    registry = TargetRegistry(DEFAULT_CONFIG, {"prod": {"instance_id": "ld-prod"}})
+    default = registry.get()
+    assert default.describe()["open_databases"] == []
+
+    pool = default.sql_pool()
+    assert pool is default.sql_pool("default")
+    assert default.sql_pool("other") is not pool
+    assert default.describe()["open_databases"] == ["default", "other"]
+    assert fake_client.created == []
+
+    assert registry.get("prod").search_client().search_host.startswith("ld-prod-")
+    with pytest.raises(ValueError):
+        registry.get("missing")
+
+
+def test_client_pool_limits_and_reuses_connections(fake_client):
+    pool = LindormWideTableClientPool("host", "root", "secret", "app", size=2)
+    results = []
+
+    def query():
+        results.append(pool.execute_query_rows("SELECT 1"))
+
+    threads = [threading.Thread(target=query) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [(["database"], [("app",)])] * 6
+    assert len(fake_client.created) == 2